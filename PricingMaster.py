@@ -1,6 +1,7 @@
 import streamlit as st
+import functools
 import itertools
-import random
+import numpy as np
 import matplotlib.pyplot as plt
 
 # -------------------------------
@@ -10,10 +11,13 @@ import matplotlib.pyplot as plt
 def generate_candidate_prices(global_min, global_max, scenario):
     num_candidates = 9
     if global_max == global_min:
-        return [global_min]
+        return np.asarray([global_min], dtype=np.float32)
     
     step = (global_max - global_min) / (num_candidates - 1)
-    candidates = [round(global_min + i * step, 2) for i in range(num_candidates)]
+    candidates = np.asarray(
+        [round(global_min + i * step, 2) for i in range(num_candidates)],
+        dtype=np.float32
+    )
     
     if scenario == "alta":
         subset = candidates[6:]  # Últimos 3 candidatos
@@ -26,37 +30,53 @@ def generate_candidate_prices(global_min, global_max, scenario):
     return subset
 
 def generate_combinations(sections, scenario, global_min, global_max, margin_factor):
-    def get_candidates(i):
-        return generate_candidate_prices(global_min, global_max, scenario)
+    # Los candidatos son idénticos para todas las secciones del escenario
+    candidates = generate_candidate_prices(global_min, global_max, scenario)
+    candidate_lists = [candidates] * len(sections)
     
-    candidate_lists = [get_candidates(i) for i in range(len(sections))]
-    valid_combos = []
-    
-    for combo in itertools.islice(itertools.product(*candidate_lists), 100_000):
-        if all(combo[j] >= margin_factor * combo[j+1] for j in range(len(combo)-1)):
-            valid_combos.append(combo)
-    
-    return valid_combos
+    # Materializar las combinaciones en una matriz (N, secciones) y filtrar el margen en bloque
+    product_iter = itertools.product(*candidate_lists)
+    combos_arr = np.fromiter(
+        itertools.chain.from_iterable(itertools.islice(product_iter, 100_000)),
+        dtype=np.float32
+    ).reshape(-1, len(sections))
+    mask = np.all(combos_arr[:, :-1] >= margin_factor * combos_arr[:, 1:], axis=1)
+    return combos_arr[mask]
+
+@functools.lru_cache(maxsize=None)
+def make_margin_check(n_sections, margin_factor):
+    # Verificación de margen desenrollada para un número fijo de secciones:
+    # evita crear un generador de all() por cada combinación
+    terms = [f"c[{i}] >= {float(margin_factor)!r} * c[{i+1}]" for i in range(n_sections - 1)]
+    return eval("lambda c: " + (" and ".join(terms) or "True"))
 
-def compute_revenue_for_combo(combo, sections, scenario):
+def compute_revenue_for_combo(combo, seats, scenario):
+    # seats: arreglo de asientos por sección, construido una sola vez por el llamador
     sell_rates = {"alta": 0.98, "moderada": 0.90, "baja": 0.85}
     sell_rate = sell_rates.get(scenario, 0.95)
-    return sum(sec['seats'] * sell_rate * price for price, sec in zip(combo, sections))
+    return float(np.dot(np.asarray(combo, dtype=seats.dtype), seats) * sell_rate)
 
 def heuristic_search(target, sections, global_min, global_max, margin_factor):
     best_combo = None
     best_diff = float('inf')
+    # Suma escalar por intento: np.dot sobre listas de 3-10 precios cuesta más que zip
+    seats = [sec['seats'] for sec in sections]
+    sell_rate = 0.98  # Escenario "alta"
+    rng = np.random.default_rng()
+    margin_ok = make_margin_check(len(sections), margin_factor)
     
-    for _ in range(10_000):
+    # Todos los uniformes en una sola llamada; rng.random() escalar es más lento que random.uniform
+    for draws in rng.random((10_000, len(sections))).tolist():
         combo = []
         prev_price = global_max
-        for _ in sections:
-            price = random.uniform(global_min, prev_price / margin_factor)
+        for r in draws:
+            # Equivale a random.uniform: admite límites invertidos
+            price = global_min + (prev_price / margin_factor - global_min) * r
             combo.append(round(price, 2))
             prev_price = price
         
-        if all(combo[i] >= margin_factor * combo[i+1] for i in range(len(combo)-1)):
-            revenue = compute_revenue_for_combo(combo, sections, "alta")
+        if margin_ok(combo):
+            revenue = sum(price * s for price, s in zip(combo, seats)) * sell_rate
             diff = abs(revenue - target)
             if diff < best_diff:
                 best_combo, best_diff = combo, diff
@@ -91,6 +111,7 @@ def main():
     
     if st.button("🔍 Buscar Combinaciones Óptimas"):
         scenarios = {"Alta Demanda": "alta", "Moderada": "moderada", "Baja": "baja"}
+        seats = np.array([sec['seats'] for sec in sections], dtype=np.float64)
         
         for scenario_name, scenario_code in scenarios.items():
             st.subheader(f"Escenario: {scenario_name}")
@@ -99,11 +120,11 @@ def main():
             combos = generate_combinations(sections, scenario_code, global_min, global_max, margin_factor)
             
             # Intento 2: Búsqueda heurística si falla el primero
-            if not combos:
+            if len(combos) == 0:
                 st.warning("Usando algoritmo de aproximación...")
                 best_combo = heuristic_search(target, sections, global_min, global_max, margin_factor)
                 if best_combo:
-                    revenue = compute_revenue_for_combo(best_combo, sections, scenario_code)
+                    revenue = compute_revenue_for_combo(best_combo, seats, scenario_code)
                     st.success(f"Mejor combinación encontrada: {best_combo}")
                     st.metric("Ingreso Estimado", f"${revenue:,.2f}", delta=f"${revenue - target:,.2f} vs Objetivo")
             
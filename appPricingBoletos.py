@@ -1,22 +1,107 @@
 import streamlit as st
-import itertools
-import random
-import matplotlib.pyplot as plt
+from bisect import bisect_right
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # Numba es opcional: sin él se usa la versión vectorizada con NumPy
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# -------------------------------
+# Kernels numéricos (compilados con Numba si está disponible)
+# -------------------------------
+
+@njit(cache=True, nogil=True)
+def _heuristic_kernel(seats, target, min_cents, max_cents, margin_factor, sell_rate, n_iter, rng):
+    """Muestreo aleatorio con extremos fijos, en centavos enteros; devuelve un arreglo vacío si no hay solución."""
+    n_sections = seats.shape[0]
+    margin_bp = round(margin_factor * 10_000)  # Margen en puntos básicos para comparar enteros
+    best_combo = np.empty(0, dtype=np.int64)
+    best_diff = np.inf
+    combo = np.empty(n_sections, dtype=np.int64)
+    
+    for _ in range(n_iter):
+        combo[0] = max_cents  # Fijar primera sección
+        prev_price = float(max_cents)
+        
+        # Generar secciones intermedias
+        for k in range(1, n_sections - 1):
+            max_price = prev_price / margin_factor
+            min_price = max(min_cents, max_price * 0.95)
+            # Equivale a random.uniform: admite límites invertidos
+            price = min_price + (max_price - min_price) * rng.random()
+            combo[k] = int(price + 0.5)
+            prev_price = price
+        
+        combo[n_sections - 1] = min_cents  # Fijar última sección
+        
+        valid = True
+        for j in range(n_sections - 1):
+            if combo[j] * 10_000 < margin_bp * combo[j + 1]:
+                valid = False
+                break
+        
+        if valid:
+            revenue = (combo * seats).sum() * sell_rate / 100
+            diff = abs(revenue - target)
+            if diff < best_diff:
+                best_combo, best_diff = combo.copy(), diff
+    
+    return best_combo
+
+def _heuristic_batch(seats, target, min_cents, max_cents, margin_factor, sell_rate, n_iter, rng):
+    """Misma búsqueda que _heuristic_kernel, con todas las muestras generadas de una vez."""
+    n_sections = seats.shape[0]
+    margin_bp = round(margin_factor * 10_000)
+    u = rng.uniform(0, 1, size=(n_iter, max(n_sections - 2, 0)))
+    
+    prices = np.empty((n_iter, n_sections))
+    prices[:, 0] = max_cents  # Fijar primera sección
+    for k in range(1, n_sections - 1):
+        upper = prices[:, k - 1] / margin_factor
+        lower = np.maximum(min_cents, upper * 0.95)
+        prices[:, k] = lower + u[:, k - 1] * (upper - lower)
+    prices[:, -1] = min_cents  # Fijar última sección
+    
+    combos = (prices + 0.5).astype(np.int64)
+    valid = np.all(combos[:, :-1] * 10_000 >= margin_bp * combos[:, 1:], axis=1)
+    diffs = np.abs(combos @ seats * sell_rate / 100 - target)
+    diffs[~valid] = np.inf
+    
+    best = np.argmin(diffs)
+    return combos[best] if valid[best] else np.empty(0, dtype=np.int64)
+
 # -------------------------------
 # Funciones Nucleares Modificadas
 # -------------------------------
 
+def pack_sections(sections):
+    """Separa las secciones en nombres y un arreglo de asientos alineado."""
+    names = [sec['name'] for sec in sections]
+    seats = np.array([sec['seats'] for sec in sections], dtype=np.float64)
+    return names, seats
+
+@st.cache_data(max_entries=32, show_spinner=False)
 def generate_candidate_prices(global_min, global_max, scenario):
-    """Genera precios candidatos adaptados al escenario entre min y max."""
+    """Genera precios candidatos (float32) adaptados al escenario entre min y max."""
     num_candidates = 9
     if global_max <= global_min:
-        return [global_min]
+        return np.asarray([global_min], dtype=np.float32)
     
     step = (global_max - global_min) / (num_candidates - 1)
-    candidates = [round(global_min + i * step, 2) for i in range(num_candidates)]
+    candidates = np.asarray(
+        [round(global_min + i * step, 2) for i in range(num_candidates)],
+        dtype=np.float32
+    )
     
     scenario_ranges = {
         "alta": candidates[6:],    # Top 33% del rango
@@ -25,52 +110,69 @@ def generate_candidate_prices(global_min, global_max, scenario):
     }
     return scenario_ranges.get(scenario, candidates)
 
-def generate_valid_combinations(sections, scenario, global_min, global_max, margin_factor):
+@st.cache_data(max_entries=32, show_spinner=False)
+def generate_valid_combinations(n_sections, scenario, global_min, global_max, margin_factor):
     """Genera combinaciones con primera y última sección fijas."""
+    # Las secciones intermedias comparten candidatos; solo varían los extremos fijos
+    middle_candidates = generate_candidate_prices(global_min, global_max, scenario)
     candidates = []
-    for i, _ in enumerate(sections):
+    for i in range(n_sections):
         if i == 0:  # Primera sección = precio máximo
-            sec_candidates = [round(global_max, 2)]
-        elif i == len(sections)-1:  # Última sección = precio mínimo
-            sec_candidates = [round(global_min, 2)]
+            sec_candidates = np.asarray([round(global_max, 2)], dtype=np.float32)
+        elif i == n_sections-1:  # Última sección = precio mínimo
+            sec_candidates = np.asarray([round(global_min, 2)], dtype=np.float32)
         else:  # Secciones intermedias
-            sec_candidates = generate_candidate_prices(global_min, global_max, scenario)
+            sec_candidates = middle_candidates
         candidates.append(sec_candidates)
     
+    # Umbrales margin_factor * precio (ascendentes, como los candidatos) para podar con bisect:
+    # en cada nivel solo se recorren los precios que respetan el margen con el anterior.
+    thresholds = [margin_factor * sec_candidates for sec_candidates in candidates]
     valid = []
-    for combo in itertools.islice(itertools.product(*candidates), 100_000):
-        if all(combo[i] >= margin_factor * combo[i+1] for i in range(len(combo)-1)):
-            valid.append(combo)
+    
+    def build(j, prev_price, current):
+        if j == len(candidates):
+            valid.append(tuple(current))
+            return
+        end = len(candidates[j]) if j == 0 else bisect_right(thresholds[j], prev_price)
+        for price in candidates[j][:end]:
+            current.append(price)
+            build(j + 1, price, current)
+            current.pop()
+    
+    build(0, None, [])
     return valid
 
-def heuristic_price_search(target, sections, global_min, global_max, margin_factor, scenario):
+def heuristic_price_search(target, seats, global_min, global_max, margin_factor, scenario):
     """Búsqueda heurística con extremos fijos."""
-    best_combo, best_diff = None, float('inf')
     sell_rates = {"alta": 0.98, "moderada": 0.90, "baja": 0.85}
     
-    for _ in range(10_000):
-        combo = [round(global_max, 2)]  # Fijar primera sección
-        prev_price = global_max
-        
-        # Generar secciones intermedias
-        for _ in range(len(sections)-2):
-            min_price = max(global_min, prev_price / margin_factor * 0.95)
-            max_price = prev_price / margin_factor
-            price = random.uniform(min_price, max_price)
-            combo.append(round(price, 2))
-            prev_price = price
-        
-        combo.append(round(global_min, 2))  # Fijar última sección
-        
-        if all(combo[i] >= margin_factor * combo[i+1] for i in range(len(combo)-1)):
-            revenue = sum(
-                sec['seats'] * sell_rates.get(scenario, 0.95) * price 
-                for price, sec in zip(combo, sections)
-            )
-            if abs(revenue - target) < best_diff:
-                best_combo, best_diff = combo, abs(revenue - target)
-    
-    return best_combo
+    # Los kernels trabajan en centavos enteros; se vuelve a dólares solo al final
+    args = (
+        seats, float(target), int(round(global_min * 100)), int(round(global_max * 100)),
+        float(margin_factor), sell_rates.get(scenario, 0.95), 10_000,
+        np.random.default_rng()
+    )
+    if HAVE_NUMBA:
+        best_combo = _heuristic_kernel(*args)
+    else:
+        best_combo = _heuristic_batch(*args)
+    return (best_combo / 100).tolist() if best_combo.size else None
+
+def run_scenario(scenario, seats, target, global_min, global_max, margin_factor):
+    """Resuelve un escenario: búsqueda exhaustiva y, si no hay resultados, heurística."""
+    combos = generate_valid_combinations(
+        len(seats), scenario, 
+        global_min, global_max, margin_factor
+    )
+    used_heuristic = not combos
+    if used_heuristic:
+        best_combo = heuristic_price_search(
+            target, seats, global_min, 
+            global_max, margin_factor, scenario
+        )
+        combos = [best_combo] if best_combo else []
+    return combos, used_heuristic
 
 # -------------------------------
 # Resto del código sin cambios
@@ -79,24 +181,25 @@ def heuristic_price_search(target, sections, global_min, global_max, margin_fact
 def generate_excel_report(results):
     output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        # Formatos globales del libro: se crean una sola vez y se comparten entre hojas
+        workbook = writer.book
+        money_format = workbook.add_format({'num_format': '$#,##0.00'})
+        percent_format = workbook.add_format({'num_format': '0.00%'})
+        
         for scenario_name, data in results.items():
+            sheet_name = scenario_name[:31]
+            seats = data['seats']
             df = pd.DataFrame({
-                'Sección': [sec['name'] for sec in data['sections']],
+                'Sección': data['names'],
                 'Precio Recomendado': data['best_combo'],
-                'Asientos Disponibles': [sec['seats'] for sec in data['sections']],
-                'Tasa de Venta': [data['sell_rate']] * len(data['sections']),
-                'Asientos Vendidos': [int(sec['seats'] * data['sell_rate']) for sec in data['sections']],
-                'Ingreso por Sección': [p * s * data['sell_rate'] for p, s in zip(
-                    data['best_combo'], 
-                    [sec['seats'] for sec in data['sections']]
-                )]
+                'Asientos Disponibles': seats.astype(np.int64),
+                'Tasa de Venta': [data['sell_rate']] * len(seats),
+                'Asientos Vendidos': (seats * data['sell_rate']).astype(np.int64),
+                'Ingreso por Sección': np.asarray(data['best_combo']) * seats * data['sell_rate']
             })
-            df.to_excel(writer, sheet_name=scenario_name[:31], index=False)
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
             
-            workbook = writer.book
-            money_format = workbook.add_format({'num_format': '$#,##0.00'})
-            percent_format = workbook.add_format({'num_format': '0.00%'})
-            worksheet = writer.sheets[scenario_name[:31]]
+            worksheet = writer.sheets[sheet_name]
             
             worksheet.set_column('A:A', 20)
             worksheet.set_column('B:B', 15, money_format)
@@ -108,25 +211,22 @@ def generate_excel_report(results):
     output.seek(0)
     return output
 
-def plot_revenue_analysis(scenario_name, top_combos, sections):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-    
-    for idx, combo in enumerate(top_combos, 1):
-        ax1.plot([sec['name'] for sec in sections], combo, marker='o', label=f'Combo {idx}')
-    ax1.set_title(f"Estrategia de Precios - {scenario_name}")
-    ax1.set_ylabel("Precio (USD)")
-    ax1.grid(True)
+def _ordered_index(labels):
+    """Índice categórico ordenado: los gráficos respetan el orden de las secciones."""
+    return pd.CategoricalIndex(labels, categories=list(dict.fromkeys(labels)), ordered=True)
+
+@st.cache_data(max_entries=32)
+def revenue_analysis_frames(top_combos, names):
+    """Tablas de precios y márgenes por combinación para st.line_chart."""
+    combos_arr = np.asarray(top_combos, dtype=np.float64)
+    labels = [f"Combo {idx}" for idx in range(1, len(top_combos) + 1)]
     
-    for combo in top_combos:
-        margins = [(combo[i] - combo[i+1])/combo[i] for i in range(len(combo)-1)]
-        ax2.plot(margins, marker='x', linestyle='--')
-    ax2.set_title("Margen entre Secciones")
-    ax2.set_ylabel("Porcentaje")
-    ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{x:.0%}"))
-    ax2.grid(True)
+    prices = pd.DataFrame(combos_arr.T, index=_ordered_index(names), columns=labels)
     
-    plt.tight_layout()
-    return fig
+    margins = (combos_arr[:, :-1] - combos_arr[:, 1:]) / combos_arr[:, :-1] * 100
+    transitions = [f"{names[i]} → {names[i+1]}" for i in range(len(names) - 1)]
+    margins = pd.DataFrame(margins.T, index=_ordered_index(transitions), columns=labels)
+    return prices, margins
 
 def main():
     st.set_page_config(page_title="Optimizador de Eventos", layout="wide")
@@ -160,43 +260,57 @@ def main():
             "Demanda Media": "moderada", 
             "Baja Demanda": "baja"
         }
+        names, seats = pack_sections(sections)
+        seats32 = seats.astype(np.float32)
+        
+        # Los escenarios son independientes: se resuelven en paralelo y la UI se arma después
+        with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+            futures = {
+                scenario_name: executor.submit(
+                    run_scenario, scenario_code, seats, 
+                    target, global_min, global_max, margin_factor
+                )
+                for scenario_name, scenario_code in scenarios.items()
+            }
+            results = {scenario_name: future.result() for scenario_name, future in futures.items()}
         
         for scenario_name, scenario_code in scenarios.items():
             with st.expander(f"📊 {scenario_name}", expanded=True):
-                combos = generate_valid_combinations(
-                    sections, scenario_code, 
-                    global_min, global_max, margin_factor
-                )
-                
-                if not combos:
+                combos, used_heuristic = results[scenario_name]
+                if used_heuristic:
                     st.warning("Usando algoritmo avanzado de aproximación...")
-                    best_combo = heuristic_price_search(
-                        target, sections, global_min, 
-                        global_max, margin_factor, scenario_code
-                    )
-                    combos = [best_combo] if best_combo else []
                 
                 if combos:
-                    top_combos = sorted(
-                        combos, 
-                        key=lambda x: abs(sum(p * s['seats'] * 0.95 for p, s in zip(x, sections)) - target)
-                    )[:3]
+                    sell_rate = {"alta": 0.98, "moderada": 0.90, "baja": 0.85}[scenario_code]
+                    # Distancia al objetivo de todas las combinaciones en una sola pasada;
+                    # argpartition (O(N)) separa las 3 mejores y solo esas se ordenan
+                    combos_arr = np.asarray(combos, dtype=np.float32)
+                    diffs = np.abs(combos_arr @ seats32 * sell_rate - target)
+                    top_idx = np.argpartition(diffs, min(2, len(diffs) - 1))[:3]
+                    top_idx = top_idx[np.lexsort((top_idx, diffs[top_idx]))]
+                    # Regreso a float64 (centavos exactos) solo para mostrar y reportar
+                    top_arr = np.round(combos_arr[top_idx].astype(np.float64), 2)
+                    top_combos = [tuple(combo) for combo in top_arr.tolist()]
+                    top_revenues = top_arr @ seats * sell_rate
                     
-                    st.pyplot(plot_revenue_analysis(scenario_name, top_combos, sections))
+                    prices_df, margins_df = revenue_analysis_frames(top_combos, names)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Estrategia de Precios - {scenario_name}**")
+                        st.line_chart(prices_df, y_label="Precio (USD)")
+                    with col2:
+                        st.markdown("**Margen entre Secciones**")
+                        st.line_chart(margins_df, y_label="Porcentaje")
                     
-                    sell_rate = {"alta": 0.98, "moderada": 0.90, "baja": 0.85}[scenario_code]
                     report_data[scenario_name] = {
                         'best_combo': top_combos[0],
                         'sell_rate': sell_rate,
-                        'sections': sections,
-                        'total_revenue': sum(
-                            p * s['seats'] * sell_rate 
-                            for p, s in zip(top_combos[0], sections)
-                        )
+                        'names': names,
+                        'seats': seats,
+                        'total_revenue': float(top_revenues[0])
                     }
                     
-                    for idx, combo in enumerate(top_combos, 1):
-                        revenue = sum(p * s['seats'] * sell_rate for p, s in zip(combo, sections))
+                    for idx, (combo, revenue) in enumerate(zip(top_combos, top_revenues), 1):
                         st.subheader(f"Opción {idx}")
                         col1, col2 = st.columns(2)
                         with col1: